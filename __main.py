@@ -1,13 +1,21 @@
 """
 Main application entry point
 """
+import os
+
 import uvicorn
 from app.backend.v1.api import app
 
 if __name__ == "__main__":
+    # DEV=1 enables auto-reload (single process); otherwise run WEB_CONCURRENCY workers
+    dev = os.getenv("DEV") == "1"
     uvicorn.run(
         "app.backend.v1.api:app",
         host="0.0.0.0",
         port=4000,
-        reload=True
+        reload=dev,
+        workers=1 if dev else int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="uvloop",
+        http="httptools",
+        log_level="info" if dev else "warning"
     )
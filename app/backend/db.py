@@ -1,13 +1,235 @@
 import asyncio
+import json
+import time
+import warnings
 import asyncpg
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from config.settings import settings
 
 
+# Schema and indexes, sent as one multi-statement script so startup costs a
+# single round-trip instead of one per statement
+DDL_SCRIPT = """
+    CREATE TABLE IF NOT EXISTS authors (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        bio TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS categories (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS tags (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS articles (
+        id SERIAL PRIMARY KEY,
+        author_id INTEGER REFERENCES authors(id),
+        category_id INTEGER REFERENCES categories(id),
+        title VARCHAR(255) NOT NULL,
+        content TEXT NOT NULL,
+        published_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS article_tags (
+        id SERIAL PRIMARY KEY,
+        article_id INTEGER REFERENCES articles(id),
+        tag_id INTEGER REFERENCES tags(id),
+        UNIQUE(article_id, tag_id)
+    );
+
+    -- article_id lookups are served by the UNIQUE(article_id, tag_id) index;
+    -- tag_id needs its own index for tag -> articles joins
+    CREATE INDEX IF NOT EXISTS article_tags_tag_id_idx
+    ON article_tags (tag_id);
+
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+    -- Store the article tsvector once at write time instead of
+    -- recomputing it for every row a search touches
+    ALTER TABLE articles
+    ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(title,'') || ' ' || coalesce(content,''))
+    ) STORED;
+
+    CREATE INDEX IF NOT EXISTS articles_tsv_idx
+    ON articles
+    USING GIN (search_tsv);
+
+    -- Superseded by articles_tsv_idx on the stored column
+    DROP INDEX IF EXISTS articles_fts_idx;
+
+    CREATE INDEX IF NOT EXISTS authors_name_trgm_idx
+    ON authors USING GIN (name gin_trgm_ops);
+
+    CREATE INDEX IF NOT EXISTS categories_name_trgm_idx
+    ON categories USING GIN (name gin_trgm_ops);
+
+    CREATE INDEX IF NOT EXISTS tags_name_trgm_idx
+    ON tags USING GIN (name gin_trgm_ops);
+
+    -- Author -> articles joins (e.g. search matches on an author name)
+    CREATE INDEX IF NOT EXISTS articles_author_id_idx
+    ON articles (author_id);
+
+    -- Composite index to speed up category-filtered queries ordered by published_date
+    CREATE INDEX IF NOT EXISTS articles_category_published_idx
+    ON articles (category_id, published_date DESC);
+"""
+
+# Natural keys, so seeding can upsert with ON CONFLICT ... RETURNING id.
+# Each runs in its own transaction after DDL_SCRIPT: on a database that
+# already holds duplicates it fails alone instead of rolling back the schema.
+NATURAL_KEY_INDEXES = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS authors_name_key ON authors (name)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS categories_name_key ON categories (name)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS tags_name_key ON tags (name)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS articles_title_key ON articles (title)",
+)
+
+# Advisory lock key serializing startup schema/seed work across workers:
+# concurrent CREATE ... IF NOT EXISTS can still collide in the catalogs
+STARTUP_LOCK_KEY = 0x6B62_0001
+
+# Query text is kept constant so asyncpg's per-connection statement cache
+# can reuse the prepared statement across calls
+GET_ARTICLES_BY_IDS_SQL = """
+    SELECT a.id, a.title, a.content, a.published_date,
+           a.author_id, a.category_id,
+           au.name as author_name, au.bio as author_bio,
+           c.name as category_name,
+           COALESCE((
+               SELECT json_agg(json_build_object('id', t.id, 'name', t.name) ORDER BY t.name)
+               FROM article_tags at
+               JOIN tags t ON t.id = at.tag_id
+               WHERE at.article_id = a.id
+           ), '[]'::json) AS tags
+    FROM articles a
+    LEFT JOIN authors au ON a.author_id = au.id
+    LEFT JOIN categories c ON a.category_id = c.id
+    WHERE a.id = ANY($1::int[])
+    ORDER BY a.published_date DESC
+"""
+
+GET_ARTICLES_BY_IDS_RANKED_SQL = """
+    SELECT a.id, a.title, a.content, a.published_date,
+           a.author_id, a.category_id,
+           au.name as author_name, au.bio as author_bio,
+           c.name as category_name,
+           ts_rank(a.search_tsv, plainto_tsquery('english', $2)) AS rank,
+           COALESCE((
+               SELECT json_agg(json_build_object('id', t.id, 'name', t.name) ORDER BY t.name)
+               FROM article_tags at
+               JOIN tags t ON t.id = at.tag_id
+               WHERE at.article_id = a.id
+           ), '[]'::json) AS tags
+    FROM articles a
+    LEFT JOIN authors au ON a.author_id = au.id
+    LEFT JOIN categories c ON a.category_id = c.id
+    WHERE a.id = ANY($1::int[])
+    ORDER BY rank DESC, a.published_date DESC
+    LIMIT $3
+"""
+
+SEARCH_ARTICLES_FTS_SQL = """
+    SELECT
+        a.id,
+        a.title,
+        a.content,
+        a.published_date,
+        a.author_id,
+        a.category_id,
+        au.name AS author_name,
+        au.bio AS author_bio,
+        c.name AS category_name,
+        -- Rank over text plus author/category names; matching is done per
+        -- source below so every branch can use an index
+        ts_rank(
+            a.search_tsv || to_tsvector('english', coalesce(au.name,'') || ' ' || coalesce(c.name,'')),
+            q
+        ) AS rank,
+        COALESCE((
+            SELECT json_agg(json_build_object('id', t.id, 'name', t.name) ORDER BY t.name)
+            FROM article_tags at
+            JOIN tags t ON t.id = at.tag_id
+            WHERE at.article_id = a.id
+        ), '[]'::json) AS tags
+    FROM articles a
+    LEFT JOIN authors au ON a.author_id = au.id
+    LEFT JOIN categories c ON a.category_id = c.id
+    CROSS JOIN websearch_to_tsquery('english', $1) AS q
+    WHERE a.id IN (
+        -- Each branch is index-driven: article text via articles_tsv_idx,
+        -- author/category names via the small name tables then the FK indexes
+        SELECT id FROM articles
+        WHERE search_tsv @@ websearch_to_tsquery('english', $1)
+        UNION
+        SELECT ar.id FROM authors au
+        JOIN articles ar ON ar.author_id = au.id
+        WHERE to_tsvector('english', au.name) @@ websearch_to_tsquery('english', $1)
+        UNION
+        SELECT ar.id FROM categories ca
+        JOIN articles ar ON ar.category_id = ca.id
+        WHERE to_tsvector('english', ca.name) @@ websearch_to_tsquery('english', $1)
+    )
+      AND ($4::int IS NULL OR a.category_id = $4)
+      AND ($2::text IS NULL OR c.name ILIKE $2)
+    ORDER BY rank DESC, a.published_date DESC
+    LIMIT $3
+"""
+
+
+# Empty-query "browse latest" path: no tsvector work, ordered by recency
+LATEST_ARTICLES_SQL = """
+    SELECT
+        a.id,
+        a.title,
+        a.content,
+        a.published_date,
+        a.author_id,
+        a.category_id,
+        au.name AS author_name,
+        au.bio AS author_bio,
+        c.name AS category_name,
+        0 AS rank,
+        COALESCE((
+            SELECT json_agg(json_build_object('id', t.id, 'name', t.name) ORDER BY t.name)
+            FROM article_tags at
+            JOIN tags t ON t.id = at.tag_id
+            WHERE at.article_id = a.id
+        ), '[]'::json) AS tags
+    FROM articles a
+    LEFT JOIN authors au ON a.author_id = au.id
+    LEFT JOIN categories c ON a.category_id = c.id
+    WHERE ($3::int IS NULL OR a.category_id = $3)
+      AND ($1::text IS NULL OR c.name ILIKE $1)
+    ORDER BY a.published_date DESC
+    LIMIT $2
+"""
+
+
+async def _init_connection(conn) -> None:
+    """Decode json/jsonb columns (e.g. aggregated tags) into Python objects
+    once per pooled connection rather than per row"""
+    for typename in ('json', 'jsonb'):
+        await conn.set_type_codec(
+            typename, encoder=json.dumps, decoder=json.loads, schema='pg_catalog'
+        )
+
+
 class Database:
     def __init__(self):
         self.pool = None
+        self.cache_ttl = 60  # Seconds reference data snapshots stay valid
+        self._cache: Dict[str, Any] = {}
+        self._cache_ts: Dict[str, float] = {}
     
     async def connect(self):
         """Create database connection pool with simple retry while DB starts up"""
@@ -21,8 +243,14 @@ class Database:
                     user=settings.POSTGRES_USER,
                     password=settings.POSTGRES_PASSWORD,
                     database=settings.POSTGRES_DB,
-                    min_size=1,
-                    max_size=10
+                    min_size=settings.DB_POOL_MIN,
+                    max_size=settings.DB_POOL_MAX,
+                    max_queries=50000,
+                    statement_cache_size=1024,
+                    # 0 keeps idle min_size connections open so the pool stays warm
+                    max_inactive_connection_lifetime=0,
+                    command_timeout=30,
+                    init=_init_connection
                 )
                 return
             except Exception as exc:
@@ -38,81 +266,45 @@ class Database:
             await self.pool.close()
     
     async def init_tables(self):
-        """Initialize database tables"""
+        """Initialize database tables and indexes in a single round-trip.
+
+        Holds STARTUP_LOCK_KEY for each transaction so workers booting together
+        run the DDL one at a time.
+        """
         async with self.pool.acquire() as conn:
-            # Create authors table
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS authors (
-                    id SERIAL PRIMARY KEY,
-                    name VARCHAR(255) NOT NULL,
-                    bio TEXT
-                )
-            """)
+            async with conn.transaction():
+                await conn.execute("SELECT pg_advisory_xact_lock($1)", STARTUP_LOCK_KEY)
+                await conn.execute(DDL_SCRIPT)
             
-            # Create categories table
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS categories (
-                    id SERIAL PRIMARY KEY,
-                    name VARCHAR(255) NOT NULL
-                )
-            """)
-            
-            # Create tags table
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS tags (
-                    id SERIAL PRIMARY KEY,
-                    name VARCHAR(255) NOT NULL
-                )
-            """)
-            
-            # Create articles table
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS articles (
-                    id SERIAL PRIMARY KEY,
-                    author_id INTEGER REFERENCES authors(id),
-                    category_id INTEGER REFERENCES categories(id),
-                    title VARCHAR(255) NOT NULL,
-                    content TEXT NOT NULL,
-                    published_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create article_tags association table
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS article_tags (
-                    id SERIAL PRIMARY KEY,
-                    article_id INTEGER REFERENCES articles(id),
-                    tag_id INTEGER REFERENCES tags(id),
-                    UNIQUE(article_id, tag_id)
-                )
-            """)
-
-            # Enable and create full-text search index for performance
-            await conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
-            await conn.execute("""
-                CREATE INDEX IF NOT EXISTS articles_fts_idx
-                ON articles
-                USING GIN (to_tsvector('english', coalesce(title,'') || ' ' || coalesce(content,'')))
-            """)
-            # Note: The composite full-text search index will be created dynamically in the search query
-            # since it requires JOINs that aren't available in CREATE INDEX context
-            await conn.execute("""
-                CREATE INDEX IF NOT EXISTS authors_name_trgm_idx
-                ON authors USING GIN (name gin_trgm_ops)
-            """)
-            await conn.execute("""
-                CREATE INDEX IF NOT EXISTS categories_name_trgm_idx
-                ON categories USING GIN (name gin_trgm_ops)
-            """)
-            await conn.execute("""
-                CREATE INDEX IF NOT EXISTS tags_name_trgm_idx
-                ON tags USING GIN (name gin_trgm_ops)
-            """)
-            # Composite index to speed up category-filtered queries ordered by published_date
-            await conn.execute("""
-                CREATE INDEX IF NOT EXISTS articles_category_published_idx
-                ON articles (category_id, published_date DESC)
-            """)
+            for statement in NATURAL_KEY_INDEXES:
+                try:
+                    async with conn.transaction():
+                        await conn.execute("SELECT pg_advisory_xact_lock($1)", STARTUP_LOCK_KEY)
+                        await conn.execute(statement)
+                except asyncpg.UniqueViolationError as exc:
+                    # Existing duplicates: keep serving, but seeding needs this index
+                    warnings.warn(
+                        f"{statement} failed ({exc}); remove the duplicate rows and restart"
+                    )
+    
+    @asynccontextmanager
+    async def _connection(self, conn: Optional[asyncpg.Connection] = None):
+        """Use the caller's connection if given, otherwise acquire one from the pool"""
+        if conn is not None:
+            yield conn
+        else:
+            async with self.pool.acquire() as acquired:
+                yield acquired
+    
+    # Reference data cache
+    def invalidate_cache(self, key: str) -> None:
+        """Drop a cached reference data snapshot after writing to its table.
+
+        The cache is per process: with several workers, the others keep
+        serving their snapshot for up to cache_ttl seconds.
+        """
+        self._cache.pop(key, None)
+        self._cache_ts.pop(key, None)
     
     # Author operations
     async def create_author(self, name: str, bio: Optional[str] = None) -> int:
@@ -123,133 +315,121 @@ class Database:
                 name, bio
             )
             return result
-    
+
+    # Article operations
+    async def create_article(
+        self,
+        title: str,
+        content: str,
+        author_id: int,
+        category_id: int,
+        tag_ids: Optional[List[int]] = None,
+    ) -> int:
+        """Create a new article and attach its tags in one transaction"""
+        async with self.pool.acquire() as conn, conn.transaction():
+            article_id = await conn.fetchval(
+                """
+                INSERT INTO articles (title, content, author_id, category_id)
+                VALUES ($1, $2, $3, $4)
+                RETURNING id
+                """,
+                title, content, author_id, category_id
+            )
+            if tag_ids:
+                # Single statement for all tags instead of one INSERT per tag
+                await conn.execute(
+                    """
+                    INSERT INTO article_tags (article_id, tag_id)
+                    SELECT $1, tag_id FROM unnest($2::int[]) AS t(tag_id)
+                    ON CONFLICT DO NOTHING
+                    """,
+                    article_id, tag_ids
+                )
+            return article_id
+
+    # Category operations
+    async def create_category(self, name: str) -> int:
+        """Create a new category"""
+        async with self.pool.acquire() as conn:
+            result = await conn.fetchval(
+                "INSERT INTO categories (name) VALUES ($1) RETURNING id",
+                name
+            )
+        self.invalidate_cache('categories')
+        return result
     
     async def get_all_categories(self) -> List[Dict[str, Any]]:
-        """Get all categories"""
+        """Get all categories, served from an in-process snapshot for cache_ttl seconds"""
+        if time.monotonic() - self._cache_ts.get('categories', 0) < self.cache_ttl and 'categories' in self._cache:
+            return self._cache['categories']
+        
         async with self.pool.acquire() as conn:
             rows = await conn.fetch("SELECT id, name FROM categories")
-            return [dict(row) for row in rows]
+        
+        categories = [dict(row) for row in rows]
+        self._cache['categories'] = categories
+        self._cache_ts['categories'] = time.monotonic()
+        return categories
     
     
 
     
     
     
-    async def get_articles_by_ids(self, article_ids: List[int]) -> List[Dict[str, Any]]:
+    async def get_articles_by_ids(self, article_ids: List[int], conn: Optional[asyncpg.Connection] = None) -> List[Dict[str, Any]]:
         """Get multiple articles by their IDs with related data"""
         if not article_ids:
             return []
         
-        async with self.pool.acquire() as conn:
-            # Create placeholders for the IN clause
-        
-            placeholders = ','.join([f'${i+1}' for i in range(len(article_ids))])
-            
-            articles = await conn.fetch(f"""
-                SELECT a.id, a.title, a.content, a.published_date,
-                       a.author_id, a.category_id,
-                       au.name as author_name, au.bio as author_bio,
-                       c.name as category_name
-                FROM articles a
-                LEFT JOIN authors au ON a.author_id = au.id
-                LEFT JOIN categories c ON a.category_id = c.id
-                WHERE a.id IN ({placeholders})
-                ORDER BY a.published_date DESC
-            """, *article_ids)
+        async with self._connection(conn) as conn:
+            articles = await conn.fetch(GET_ARTICLES_BY_IDS_SQL, article_ids)
             
-            result = []
-            for article in articles:
-                article_dict = dict(article)
-                
-                # Get tags for each article
-                tags = await conn.fetch("""
-                    SELECT t.id, t.name
-                    FROM tags t
-                    JOIN article_tags at ON t.id = at.tag_id
-                    WHERE at.article_id = $1
-                """, article['id'])
-                
-                article_dict['tags'] = [dict(tag) for tag in tags]
-                result.append(article_dict)
-            
-            return result
+            return [dict(article) for article in articles]
+
+    async def get_articles_by_ids_ranked(self, article_ids: List[int], question: str, limit: int = 5, conn: Optional[asyncpg.Connection] = None) -> List[Dict[str, Any]]:
+        """Get the articles among the given IDs most relevant to a question,
+        ranked by full-text rank then published_date desc"""
+        if not article_ids:
+            return []
+
+        async with self._connection(conn) as conn:
+            articles = await conn.fetch(
+                GET_ARTICLES_BY_IDS_RANKED_SQL, article_ids, question, limit
+            )
+
+            return [dict(article) for article in articles]
     
     
     
-    async def search_articles_fts(self, query: str, category: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+    async def search_articles_fts(self, query: str, category: Optional[str] = None, limit: int = 5, category_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """Full-text search with joins and relevance sorting.
         - Joins authors, categories, tags
-        - Optional category filter by category name
+        - Optional category filter by id (exact, indexed) or by category name (fuzzy)
         - Orders by full-text rank then published_date desc
+        - A blank query skips FTS and returns the latest articles
         - Limits results to avoid overwhelming the LLM
         """
-        # Convert simple text into a tsquery AND pattern
-        # e.g., "full stack" -> "full & stack"
-        ts_query = ' & '.join([part for part in query.strip().split() if part])
-        if not ts_query:
-            ts_query = query or ''
+        # websearch_to_tsquery parses raw user input (quotes, "or", "-term")
+        # and never raises on stray punctuation such as "C++" or "what's"
+        ts_query = (query or '').strip()
+        category_pattern = f"%{category}%" if category else None
 
         async with self.pool.acquire() as conn:
-            rows = await conn.fetch(
-                """
-                WITH ranked AS (
-                    SELECT
-                        a.id,
-                        a.title,
-                        a.content,
-                        a.published_date,
-                        a.author_id,
-                        a.category_id,
-                        au.name AS author_name,
-                        au.bio AS author_bio,
-                        c.name AS category_name,
-                        to_tsvector('english', coalesce(a.title,'') || ' ' || coalesce(a.content,'') || ' ' || coalesce(au.name,'') || ' ' || coalesce(c.name,'')) AS document,
-                        to_tsquery('english', $1) AS q
-                    FROM articles a
-                    LEFT JOIN authors au ON a.author_id = au.id
-                    LEFT JOIN categories c ON a.category_id = c.id
-                    WHERE ($2::text IS NULL OR c.name ILIKE $2)
+            if not ts_query:
+                rows = await conn.fetch(
+                    LATEST_ARTICLES_SQL, category_pattern, limit, category_id
                 )
-                SELECT
-                    r.id,
-                    r.title,
-                    r.content,
-                    r.published_date,
-                    r.author_id,
-                    r.category_id,
-                    r.author_name,
-                    r.author_bio,
-                    r.category_name,
-                    CASE WHEN $1 <> '' THEN ts_rank(r.document, r.q) ELSE 0 END AS rank
-                FROM ranked r
-                WHERE ($1 = '' OR r.document @@ r.q)
-                ORDER BY rank DESC, r.published_date DESC
-                LIMIT $3
-                """,
+                return [dict(row) for row in rows]
+
+            rows = await conn.fetch(
+                SEARCH_ARTICLES_FTS_SQL,
                 ts_query,
-                f"%{category}%" if category else None,
+                category_pattern,
                 limit,
+                category_id,
             )
 
-            results: List[Dict[str, Any]] = []
-            for row in rows:
-                article_dict = dict(row)
-                # Fetch tags for each article
-                tags = await conn.fetch(
-                    """
-                    SELECT t.id, t.name
-                    FROM tags t
-                    JOIN article_tags at ON t.id = at.tag_id
-                    WHERE at.article_id = $1
-                    ORDER BY t.name ASC
-                    """,
-                    article_dict['id'],
-                )
-                article_dict['tags'] = [dict(tag) for tag in tags]
-                results.append(article_dict)
-
-            return results
+            return [dict(row) for row in rows]
 
 
 # Global database instance
@@ -1,46 +1,111 @@
 import asyncio
-import re
-from typing import List, Dict, Any, Optional
-from openai import AsyncOpenAI
+import hashlib
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+import tiktoken
+from openai import AsyncOpenAI, RateLimitError
 import os
 from config.settings import settings
 
 
+@lru_cache(maxsize=1)
+def _encoding() -> Optional[tiktoken.Encoding]:
+    """Load the tokenizer used by gpt-3.5-turbo, or None if it is unavailable.
+
+    The first load may download the BPE file (unless TIKTOKEN_CACHE_DIR holds
+    it), so LLMService.warm_up runs it at startup, off the event loop.
+    """
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # e.g. offline without a cached BPE file: fall back to the char estimate
+        return None
+
+
 class LLMService:
     
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # SDK retries are disabled so _create_completion owns backoff and never
+        # sleeps while holding a semaphore slot
+        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
         self.max_tokens = 4000  # Context window limit
-        self.approx_tokens_per_char = 0.25  # Rough estimation: 4 chars per token
+        self.approx_tokens_per_char = 0.25  # Fallback estimate when tiktoken can't load
+        self.max_concurrent_requests = 8  # Concurrent OpenAI calls per process
+        self.max_rate_limit_retries = 3  # Retries on 429 with exponential backoff
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        self.answer_cache_ttl = 300  # Seconds a cached answer stays valid
+        self.answer_cache_size = 512  # Max cached answers (LRU eviction)
+        self._answer_cache: OrderedDict[bytes, Tuple[float, str]] = OrderedDict()
+    
+    def _answer_cache_key(self, question: str, context_articles: List[Dict[str, Any]]) -> bytes:
+        """Build a cache key from the normalized question and the context article ids"""
+        ids = sorted(str(article.get('id')) for article in context_articles)
+        raw = question.strip().lower() + '|' + ','.join(ids)
+        return hashlib.blake2b(raw.encode()).digest()
+    
+    def _get_cached_answer(self, key: bytes) -> Optional[str]:
+        """Return a cached answer if present and not expired"""
+        entry = self._answer_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, answer = entry
+        if time.monotonic() - stored_at > self.answer_cache_ttl:
+            del self._answer_cache[key]
+            return None
+        self._answer_cache.move_to_end(key)
+        return answer
+    
+    def _store_answer(self, key: bytes, answer: str) -> None:
+        """Cache an answer, evicting the least recently used entry when full"""
+        self._answer_cache[key] = (time.monotonic(), answer)
+        self._answer_cache.move_to_end(key)
+        if len(self._answer_cache) > self.answer_cache_size:
+            self._answer_cache.popitem(last=False)
+    
+    async def _create_completion(self, **kwargs):
+        """Call the chat completions API with bounded concurrency, backing off on rate limits"""
+        delay = 1.0
+        for attempt in range(self.max_rate_limit_retries + 1):
+            try:
+                async with self._semaphore:
+                    return await self.client.chat.completions.create(**kwargs)
+            except RateLimitError:
+                if attempt == self.max_rate_limit_retries:
+                    raise
+            # Back off outside the semaphore so waiting does not hold a slot
+            await asyncio.sleep(delay)
+            delay *= 2
+    
+    async def warm_up(self) -> None:
+        """Load the tokenizer in a worker thread so no request pays for it"""
+        await asyncio.to_thread(_encoding)
     
     def estimate_tokens(self, text: str) -> int:
-        """Estimate token count using character-based approximation"""
-        return int(len(text) * self.approx_tokens_per_char)
+        """Count tokens with the model's tokenizer, or estimate from length"""
+        encoding = _encoding()
+        if encoding is None:
+            return int(len(text) * self.approx_tokens_per_char)
+        return len(encoding.encode(text, disallowed_special=()))
     
     def chunk_text(self, text: str, max_chunk_size: int = 1000) -> List[str]:
-        """Split text into chunks, respecting word boundaries"""
-        if self.estimate_tokens(text) <= max_chunk_size:
-            return [text]
-        
-        chunks = []
-        words = text.split()
-        current_chunk = []
-        current_size = 0
-        
-        for word in words:
-            word_size = self.estimate_tokens(word + " ")
-            if current_size + word_size > max_chunk_size and current_chunk:
-                chunks.append(" ".join(current_chunk))
-                current_chunk = [word]
-                current_size = word_size
-            else:
-                current_chunk.append(word)
-                current_size += word_size
+        """Split text into chunks of at most max_chunk_size tokens"""
+        encoding = _encoding()
+        if encoding is None:
+            # Same 4-chars-per-token estimate as estimate_tokens
+            step = int(max_chunk_size / self.approx_tokens_per_char)
+            return [text[i:i + step] for i in range(0, len(text), step)] or [text]
         
-        if current_chunk:
-            chunks.append(" ".join(current_chunk))
+        token_ids = encoding.encode(text, disallowed_special=())
+        if len(token_ids) <= max_chunk_size:
+            return [text]
         
-        return chunks
+        # Tokenize once and slice by token index instead of re-counting per word
+        return [
+            encoding.decode(token_ids[i:i + max_chunk_size])
+            for i in range(0, len(token_ids), max_chunk_size)
+        ]
     
     async def summarize_context(self, articles: List[Dict[str, Any]]) -> str:
         """Summarize long context using LLM if needed"""
@@ -60,7 +125,7 @@ class LLMService:
 Provide a concise summary that captures the main points and key details:"""
         
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._create_completion(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=2000,
@@ -76,8 +141,15 @@ Provide a concise summary that captures the main points and key details:"""
         if not context_articles:
             return "No relevant context found to answer your question."
         
+        # Repeated questions over the same articles skip the OpenAI round-trip
+        cache_key = self._answer_cache_key(question, context_articles)
+        cached = self._get_cached_answer(cache_key)
+        if cached is not None:
+            return cached
+        
         # Prepare context
         context_parts = []
+        context_tokens = 0
         for article in context_articles:
             article_text = f"Title: {article.get('title', '')}\n"
             article_text += f"Author: {article.get('author_name', 'Unknown')}\n"
@@ -90,12 +162,15 @@ Provide a concise summary that captures the main points and key details:"""
                 article_text += f"Tags: {', '.join(tags)}\n"
             
             context_parts.append(article_text)
+            context_tokens += self.estimate_tokens(article_text)
         
         # Combine all context
-        full_context = "\n\n---\n\n".join(context_parts)
+        separator = "\n\n---\n\n"
+        full_context = separator.join(context_parts)
+        context_tokens += self.estimate_tokens(separator) * (len(context_parts) - 1)
         
         # Check if context needs summarization
-        if self.estimate_tokens(full_context) > self.max_tokens:
+        if context_tokens > self.max_tokens:
             full_context = await self.summarize_context(context_articles)
         
         # Create the prompt
@@ -108,43 +183,18 @@ Question: {question}
 Please provide a concise and accurate answer based on the information above. If the context doesn't contain enough information to answer the question, please say so."""
 
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._create_completion(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=500,
                 temperature=0.3
             )
-            return response.choices[0].message.content
         except Exception as e:
             return f"Error generating answer: {str(e)}"
-    
-    async def prioritize_articles(self, articles: List[Dict[str, Any]], question: str, max_articles: int = 5) -> List[Dict[str, Any]]:
-        """Prioritize articles based on relevance to the question"""
-        if len(articles) <= max_articles:
-            return articles
-        
-        # Simple relevance scoring based on keyword matching
-        question_words = set(re.findall(r'\b\w+\b', question.lower()))
-        
-        scored_articles = []
-        for article in articles:
-            score = 0
-            title_words = set(re.findall(r'\b\w+\b', article.get('title', '').lower()))
-            content_words = set(re.findall(r'\b\w+\b', article.get('content', '').lower()))
-            
-            # Score based on title matches (higher weight)
-            title_matches = len(question_words.intersection(title_words))
-            score += title_matches * 3
-            
-            # Score based on content matches
-            content_matches = len(question_words.intersection(content_words))
-            score += content_matches
-            
-            scored_articles.append((score, article))
         
-        # Sort by score and return top articles
-        scored_articles.sort(key=lambda x: x[0], reverse=True)
-        return [article for score, article in scored_articles[:max_articles]]
+        answer = response.choices[0].message.content
+        self._store_answer(cache_key, answer)
+        return answer
 
 
 # Global LLM service instance
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.backend.v1.endpoints import article, category
 from app.backend.db import db
+from app.backend.services.llm_service import llm_service
 from data.seed_data import seed
 
 
@@ -13,6 +14,8 @@ async def startup_event():
     """Initialize database connection and create tables"""
     await db.connect()
     await db.init_tables()
+    # Load the tokenizer now rather than inside the first /ask
+    await llm_service.warm_up()
     # Seed data on app startup
     try:
         await seed()
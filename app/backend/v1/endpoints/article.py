@@ -16,26 +16,29 @@ router = APIRouter(tags=["Articles"], prefix="/api/v1")
 async def ask_question(request: AskRequest):
     """Answer a question using LLM with provided article context"""
     try:
-        # Get articles by IDs
-        articles = await db.get_articles_by_ids(request.context_ids)
+        # Get the articles most relevant to the question, ranked in Postgres.
+        # The connection is held only for the DB work, not the LLM call.
+        async with db.pool.acquire() as conn:
+            prioritized_articles = await db.get_articles_by_ids_ranked(
+                request.context_ids, request.question, limit=5, conn=conn
+            )
         
-        if not articles:
+        if not prioritized_articles:
             return AskResponse(
                 answer="No relevant context found to answer your question.",
                 context_used=[]
             )
         
-        # Prioritize articles based on question relevance
-        prioritized_articles = await llm_service.prioritize_articles(
-            articles, request.question, max_articles=5
-        )
+        # Validate the context before the LLM call so a bad row fails fast
+        # instead of after a billed completion
+        context_used = [ArticleResponse.model_validate(article) for article in prioritized_articles]
         
         # Generate answer using LLM
         answer = await llm_service.answer_question(request.question, prioritized_articles)
         
         return AskResponse(
             answer=answer,
-            context_used=prioritized_articles
+            context_used=context_used
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -46,10 +49,13 @@ async def ask_question(request: AskRequest):
 async def search_articles(
     query: str = Query(..., min_length=1, description="Search term"),
     category: Optional[str] = Query(None, description="Optional category name filter"),
+    category_id: Optional[int] = Query(None, description="Optional exact category id filter"),
     limit: int = Query(5, ge=1, le=25, description="Max results; capped to protect LLM context")
 ):
     try:
-        results = await db.search_articles_fts(query=query, category=category, limit=limit)
+        results = await db.search_articles_fts(
+            query=query, category=category, limit=limit, category_id=category_id
+        )
         return results
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
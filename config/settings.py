@@ -13,6 +13,8 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = os.environ.get('POSTGRES_DB', 'knowledge_base')
     POSTGRES_HOST: str = os.environ.get('POSTGRES_HOST', 'db')
     POSTGRES_PORT: int = int(os.environ.get('POSTGRES_PORT', '5432'))
+    DB_POOL_MIN: int = int(os.environ.get('DB_POOL_MIN', '5'))
+    DB_POOL_MAX: int = int(os.environ.get('DB_POOL_MAX', '20'))
     
 
     
@@ -1,195 +1,172 @@
 import asyncio
 import random
-from typing import List, Optional, Dict, Any
-
-from app.backend.db import db
-
-
-async def ensure_author(name: str, bio: Optional[str] = None) -> int:
-    async with db.pool.acquire() as conn:  # type: ignore
-        row = await conn.fetchrow("SELECT id FROM authors WHERE name = $1", name)
-        if row:
-            return row["id"]
-    return await db.create_author(name=name, bio=bio)
-
-
-async def ensure_category(name: str) -> int:
-    async with db.pool.acquire() as conn:  # type: ignore
-        row = await conn.fetchrow("SELECT id FROM categories WHERE name = $1", name)
-        if row:
-            return row["id"]
-    return await db.create_category(name=name)
-
-
-async def ensure_tag(name: str) -> int:
-    async with db.pool.acquire() as conn:  # type: ignore
-        row = await conn.fetchrow("SELECT id FROM tags WHERE name = $1", name)
-        if row:
-            return row["id"]
-    return await db.create_tag(name=name)
-
-
-async def ensure_article(title: str, content: str, author_id: int, category_id: int) -> int:
-    async with db.pool.acquire() as conn:  # type: ignore
-        row = await conn.fetchrow("SELECT id FROM articles WHERE title = $1", title)
-        if row:
-            return row["id"]
-    return await db.create_article(title=title, content=content, author_id=author_id, category_id=category_id)
-
-
-async def add_article_tags(article_id: int, tag_ids: List[int]) -> None:
-    if not tag_ids:
-        return
-    async with db.pool.acquire() as conn:  # type: ignore
-        for tag_id in tag_ids:
-            # UNIQUE(article_id, tag_id) prevents duplicates
-            await conn.execute(
-                """
-                INSERT INTO article_tags (article_id, tag_id)
-                VALUES ($1, $2)
-                ON CONFLICT DO NOTHING
-                """,
-                article_id,
-                tag_id,
-            )
-
-
-async def seed() -> Dict[str, Any]:
-    # Assumes DB is already connected and tables are initialized by the app startup
-
-    # Authors
-    author_ids: Dict[str, int] = {}
+import sys
+from collections import Counter
+from typing import List, Optional, Dict, Any, Sequence, Tuple
+
+import asyncpg
+
+from app.backend.db import STARTUP_LOCK_KEY, db
+
+
+COMMON_SENTENCES = [
+    "Performance tuning starts with profiling and realistic benchmarks before applying targeted optimizations.",
+    "Clear documentation and typed interfaces improve long-term maintainability and onboarding speed.",
+    "Automated CI pipelines enforce quality gates and produce reproducible artifacts for traceable releases.",
+    "Idempotent operations and robust retries are crucial for resilient distributed workflows.",
+]
+
+CATEGORY_SENTENCES: Dict[str, List[str]] = {
+    "Programming": [
+        "FastAPI leverages Python type hints to auto-generate OpenAPI and deliver excellent DX.",
+        "AsyncIO enables high-throughput non-blocking IO using event loops, tasks, and coroutines.",
+        "Pydantic models centralize validation and serialization for clean API contracts.",
+        "Dependency Injection in FastAPI (Depends) promotes modular design and testability.",
+        "Cursor-based pagination avoids OFFSET scans and keeps response latency predictable.",
+        "WebSockets support real-time messaging with connection lifecycle management.",
+    ],
+    "Databases": [
+        "PostgreSQL B-Tree, GIN, and BRIN indexes target different access patterns and data distributions.",
+        "Composite indexes like (category_id, published_date) accelerate sorted range scans.",
+        "Explain Analyze reveals join strategies, filter selectivity, and potential index usage.",
+        "Partial indexes reduce bloat by indexing only hot subsets of data.",
+        "To_tsvector and to_tsquery power relevance-ranked full-text search.",
+        "Proper connection pooling protects the database from overload under bursty traffic.",
+    ],
+    "DevOps": [
+        "Multi-stage Docker builds keep runtime images slim and secure.",
+        "Healthchecks and readiness probes enable zero-downtime rollouts.",
+        "SBOMs and image scanning help track and remediate vulnerabilities.",
+        "Secrets management and least-privilege access reduce blast radius.",
+        "Caching layers and build graph optimization speed up CI pipelines.",
+        "Observability (logs, metrics, traces) shortens MTTR for production incidents.",
+    ],
+}
+
+MAINTAINABILITY_SENTENCE = "This pattern reduces operational toil and enhances maintainability."
+BENCHMARK_SENTENCE = "Code samples and benchmarks reflect realistic traffic and data distributions."
+
+MIN_CONTENT_WORDS = 500
+MAX_CONTENT_WORDS = 2000
+
+
+def _corpus_words(sentences: List[str]) -> List[str]:
+    """Repeat the sentences into one word list long enough for any article
+    slice (offset < MAX_CONTENT_WORDS plus up to MAX_CONTENT_WORDS words)"""
+    words = " ".join(sentences + [MAINTAINABILITY_SENTENCE, BENCHMARK_SENTENCE]).split()
+    return words * (2 * MAX_CONTENT_WORDS // len(words) + 1)
+
+
+# Seed filler is never read back during seeding, so build each category's
+# corpus once and give every article a different window into it
+CORPUS_WORDS = {
+    category: _corpus_words(bank + COMMON_SENTENCES)
+    for category, bank in CATEGORY_SENTENCES.items()
+}
+DEFAULT_CORPUS_WORDS = _corpus_words(COMMON_SENTENCES)
+
+
+def generate_content(
+    category: str,
+    title: str,
+    index: int,
+    min_words: int = MIN_CONTENT_WORDS,
+    max_words: int = MAX_CONTENT_WORDS,
+    rng: Optional[random.Random] = None,
+) -> str:
+    target = (rng or random).randint(min_words, max_words)
+
+    # Intro paragraph tailored to title/category
+    intro_words = (
+        f"{title} — This article explores practical techniques in {category.lower()} "
+        f"with step-by-step guidance, trade-offs, and production-ready patterns."
+    ).split()
+
+    # Shift the window per article so bodies differ without re-randomizing words
+    corpus = CORPUS_WORDS.get(category, DEFAULT_CORPUS_WORDS)
+    offset = (index * 97) % MAX_CONTENT_WORDS
+    body_words = corpus[offset:offset + max(target - len(intro_words), 0)]
+    return " ".join(intro_words + body_words)
+
+
+# Names are interned so every article dict and every {name: id} map shares
+# the same string objects, letting dict lookups hit the identity fast path
+AUTHORS = tuple(
+    (sys.intern(name), bio)
     for name, bio in [
         ("Saqib", "Full-stack developer and tech writer."),
         ("Alice Johnson", "Backend engineer specializing in Python and FastAPI."),
         ("Bob Smith", "Database enthusiast with a love for PostgreSQL performance."),
-    ]:
-        author_ids[name] = await ensure_author(name, bio)
-
-    # Categories
-    category_ids: Dict[str, int] = {}
-    for name in ["Programming", "Databases", "DevOps"]:
-        category_ids[name] = await ensure_category(name)
-
-    # Tags
-    tag_ids: Dict[str, int] = {}
-    for name in ["Python", "FastAPI", "PostgreSQL", "Docker", "AsyncIO"]:
-        tag_ids[name] = await ensure_tag(name)
-
-    def generate_content(category: str, title: str, min_words: int = 500, max_words: int = 2000) -> str:
-        common = [
-            "Performance tuning starts with profiling and realistic benchmarks before applying targeted optimizations.",
-            "Clear documentation and typed interfaces improve long-term maintainability and onboarding speed.",
-            "Automated CI pipelines enforce quality gates and produce reproducible artifacts for traceable releases.",
-            "Idempotent operations and robust retries are crucial for resilient distributed workflows.",
-        ]
-
-        programming_bank = [
-            "FastAPI leverages Python type hints to auto-generate OpenAPI and deliver excellent DX.",
-            "AsyncIO enables high-throughput non-blocking IO using event loops, tasks, and coroutines.",
-            "Pydantic models centralize validation and serialization for clean API contracts.",
-            "Dependency Injection in FastAPI (Depends) promotes modular design and testability.",
-            "Cursor-based pagination avoids OFFSET scans and keeps response latency predictable.",
-            "WebSockets support real-time messaging with connection lifecycle management.",
-        ]
-
-        databases_bank = [
-            "PostgreSQL B-Tree, GIN, and BRIN indexes target different access patterns and data distributions.",
-            "Composite indexes like (category_id, published_date) accelerate sorted range scans.",
-            "Explain Analyze reveals join strategies, filter selectivity, and potential index usage.",
-            "Partial indexes reduce bloat by indexing only hot subsets of data.",
-            "To_tsvector and to_tsquery power relevance-ranked full-text search.",
-            "Proper connection pooling protects the database from overload under bursty traffic.",
-        ]
-
-        devops_bank = [
-            "Multi-stage Docker builds keep runtime images slim and secure.",
-            "Healthchecks and readiness probes enable zero-downtime rollouts.",
-            "SBOMs and image scanning help track and remediate vulnerabilities.",
-            "Secrets management and least-privilege access reduce blast radius.",
-            "Caching layers and build graph optimization speed up CI pipelines.",
-            "Observability (logs, metrics, traces) shortens MTTR for production incidents.",
-        ]
-
-        bank_map = {
-            "Programming": programming_bank,
-            "Databases": databases_bank,
-            "DevOps": devops_bank,
-        }
-
-        target = random.randint(min_words, max_words)
-        words: List[str] = []
-
-        # Intro paragraph tailored to title/category
-        intro = (
-            f"{title} — This article explores practical techniques in {category.lower()} "
-            f"with step-by-step guidance, trade-offs, and production-ready patterns."
-        )
-        words.extend(intro.split())
-
-        bank = bank_map.get(category, []) + common
-        while len(words) < target:
-            sentence = random.choice(bank)
-            if random.random() < 0.25:
-                sentence += " This pattern reduces operational toil and enhances maintainability."
-            if random.random() < 0.2:
-                sentence += " Code samples and benchmarks reflect realistic traffic and data distributions."
-            words.extend(sentence.split())
-
-        return " ".join(words[:target])
-
-    base_titles = [
-        "Designing resilient FastAPI microservices",
-        "PostgreSQL indexing deep dive",
-        "AsyncIO patterns for production",
-        "Observability for Python services",
-        "Scaling full-text search with PostgreSQL",
-        "Optimizing Docker images for CI",
-        "Connection pooling strategies",
-        "Reliable background processing",
-        "API versioning and compatibility",
-        "Secure configuration management",
-        "WebSockets at scale",
-        "Effective schema evolution",
-        "Testing strategies for async code",
-        "Cursor-based pagination techniques",
-        "Tuning query performance",
-        "Streaming large responses",
-        "Idempotent endpoint design",
-        "Monitoring query hotspots",
-        "Graceful shutdown patterns",
-        "Dependency injection best practices",
-        "Container security essentials",
-        "Partitioning strategies for time-series",
-        "JSONB patterns and GIN indexes",
-        "Task scheduling with AsyncIO",
-        "Operational dashboards that matter",
     ]
-
-    authors_cycle = ["Saqib", "Alice Johnson", "Bob Smith"]
-    categories_cycle = ["Programming", "Databases", "DevOps"]
-    tags_pool = ["Python", "FastAPI", "PostgreSQL", "Docker", "AsyncIO"]
-
-    # Create at least 20 articles; use up to len(base_titles)
-    num_articles = max(20, min(25, len(base_titles)))
+)
+CATEGORIES = tuple(map(sys.intern, ["Programming", "Databases", "DevOps"]))
+TAGS = tuple(map(sys.intern, ["Python", "FastAPI", "PostgreSQL", "Docker", "AsyncIO"]))
+
+# Tags relevant to each category
+CATEGORY_TAGS = {
+    category: tuple(map(sys.intern, tags))
+    for category, tags in {
+        "Programming": ["Python", "FastAPI", "AsyncIO"],
+        "Databases": ["PostgreSQL", "Python"],
+        "DevOps": ["Docker", "Python"],
+    }.items()
+}
+
+BASE_TITLES = [
+    "Designing resilient FastAPI microservices",
+    "PostgreSQL indexing deep dive",
+    "AsyncIO patterns for production",
+    "Observability for Python services",
+    "Scaling full-text search with PostgreSQL",
+    "Optimizing Docker images for CI",
+    "Connection pooling strategies",
+    "Reliable background processing",
+    "API versioning and compatibility",
+    "Secure configuration management",
+    "WebSockets at scale",
+    "Effective schema evolution",
+    "Testing strategies for async code",
+    "Cursor-based pagination techniques",
+    "Tuning query performance",
+    "Streaming large responses",
+    "Idempotent endpoint design",
+    "Monitoring query hotspots",
+    "Graceful shutdown patterns",
+    "Dependency injection best practices",
+    "Container security essentials",
+    "Partitioning strategies for time-series",
+    "JSONB patterns and GIN indexes",
+    "Task scheduling with AsyncIO",
+    "Operational dashboards that matter",
+]
+
+
+SEED_ARTICLE_COUNT = 25
+
+
+def _generated_articles(n: int = SEED_ARTICLE_COUNT, seed: int = 0) -> List[Dict[str, Any]]:
+    """Build n (at least 20) source articles cycling through authors, categories and titles.
+
+    Draws come from a generator seeded with `seed`, so the same call always
+    produces the same articles.
+    """
+    rng = random.Random(seed)
+    authors_cycle = tuple(name for name, _ in AUTHORS)
+    num_articles = max(20, n)
+    title_counts = Counter(BASE_TITLES)
     source_articles: List[Dict[str, Any]] = []
     for i in range(num_articles):
-        title = base_titles[i % len(base_titles)]
+        title = BASE_TITLES[i % len(BASE_TITLES)]
         # Ensure uniqueness by appending an index for repeated titles
-        if base_titles.count(title) > 1 or i >= len(base_titles):
+        if title_counts[title] > 1 or i >= len(BASE_TITLES):
             title = f"{title} #{i+1}"
         author = authors_cycle[i % len(authors_cycle)]
-        category = categories_cycle[i % len(categories_cycle)]
-        # Pick tags relevant to category
-        if category == "Programming":
-            tag_options = ["Python", "FastAPI", "AsyncIO"]
-        elif category == "Databases":
-            tag_options = ["PostgreSQL", "Python"]
-        else:
-            tag_options = ["Docker", "Python"]
-        k = 2 if len(tag_options) == 2 else random.randint(2, 3)
-        tags = random.sample(tag_options, k=k)
-        content = generate_content(category, title, 500, 2000)
+        category = CATEGORIES[i % len(CATEGORIES)]
+        tag_options = CATEGORY_TAGS[category]
+        k = 2 if len(tag_options) == 2 else rng.randint(2, 3)
+        # Sorted tuple so articles with the same tag set share one lookup key
+        tags = tuple(sorted(rng.sample(tag_options, k=k)))
+        content = generate_content(category, title, i, rng=rng)
         source_articles.append({
             "title": title,
             "author": author,
@@ -197,19 +174,198 @@ async def seed() -> Dict[str, Any]:
             "content": content,
             "tags": tags,
         })
+    return source_articles
+
+
+async def ensure_many(
+    table: str,
+    names: Sequence[str],
+    bios: Optional[List[Optional[str]]] = None,
+    conn: Optional[asyncpg.Connection] = None,
+) -> Dict[str, int]:
+    """Return {name: id} for the given names, inserting any that are missing.
+
+    A single upsert: the no-op DO UPDATE makes RETURNING yield existing rows too.
+    """
+    # Pool methods acquire and release internally when no connection is given
+    executor = conn or db.pool  # type: ignore
+
+    if bios is None:
+        rows = await executor.fetch(
+            f"""
+            INSERT INTO {table} (name)
+            SELECT unnest($1::text[])
+            ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+            RETURNING id, name
+            """,
+            list(dict.fromkeys(names)),
+        )
+    else:
+        bio_by_name = dict(zip(names, bios, strict=True))
+        rows = await executor.fetch(
+            f"""
+            INSERT INTO {table} (name, bio)
+            SELECT * FROM unnest($1::text[], $2::text[])
+            ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+            RETURNING id, name
+            """,
+            list(bio_by_name),
+            list(bio_by_name.values()),
+        )
+    # Intern names read back from the DB so they resolve to the module's constants
+    return {sys.intern(row["name"]): row["id"] for row in rows}
+
+
+async def ensure_articles(
+    records: List[Tuple[str, str, int, int]],
+    conn: Optional[asyncpg.Connection] = None,
+) -> List[int]:
+    """Upsert (title, content, author_id, category_id) records by title in one
+    statement and return their ids in input order"""
+    executor = conn or db.pool  # type: ignore
+
+    titles, contents, author_ids, category_ids = (list(column) for column in zip(*records, strict=True))
+    rows = await executor.fetch(
+        """
+        INSERT INTO articles (title, content, author_id, category_id)
+        SELECT * FROM unnest($1::text[], $2::text[], $3::int[], $4::int[])
+        ON CONFLICT (title) DO UPDATE SET title = EXCLUDED.title
+        RETURNING id, title
+        """,
+        titles,
+        contents,
+        author_ids,
+        category_ids,
+    )
+    id_by_title = {row["title"]: row["id"] for row in rows}
+    return [id_by_title[title] for title in titles]
+
+
+async def copy_articles(
+    records: List[Tuple[str, str, int, int]],
+    conn: Optional[asyncpg.Connection] = None,
+) -> List[int]:
+    """Bulk-load (title, content, author_id, category_id) records with binary COPY.
+
+    COPY has no RETURNING, so ids are read back by title in one follow-up SELECT.
+    """
+    executor = conn or db.pool  # type: ignore
+
+    titles = [record[0] for record in records]
+    await executor.copy_records_to_table(
+        "articles",
+        records=records,
+        columns=["title", "content", "author_id", "category_id"],
+    )
+    rows = await executor.fetch(
+        "SELECT id, title FROM articles WHERE title = ANY($1::text[])", titles
+    )
+    id_by_title = {row["title"]: row["id"] for row in rows}
+    return [id_by_title[title] for title in titles]
+
+
+async def add_article_tags(
+    pairs: List[Tuple[int, int]],
+    conn: Optional[asyncpg.Connection] = None,
+) -> None:
+    """Attach tags from (article_id, tag_id) pairs with a single statement"""
+    if not pairs:
+        return
+    executor = conn or db.pool  # type: ignore
+
+    article_ids = [article_id for article_id, _ in pairs]
+    tag_ids = [tag_id for _, tag_id in pairs]
+    # UNIQUE(article_id, tag_id) prevents duplicates
+    await executor.execute(
+        """
+        INSERT INTO article_tags (article_id, tag_id)
+        SELECT * FROM unnest($1::int[], $2::int[])
+        ON CONFLICT DO NOTHING
+        """,
+        article_ids,
+        tag_ids,
+    )
+
+
+async def _fetch_existing_ids(conn: asyncpg.Connection) -> Dict[str, Any]:
+    """Return the ids of already-seeded rows in the same shape seed() returns"""
+    id_maps: Dict[str, Dict[str, int]] = {}
+    for table, names in (
+        ("authors", [name for name, _ in AUTHORS]),
+        ("categories", CATEGORIES),
+        ("tags", TAGS),
+    ):
+        rows = await conn.fetch(
+            f"SELECT id, name FROM {table} WHERE name = ANY($1::text[])", list(names)
+        )
+        # Interned like ensure_many's keys so both paths return the module's constants
+        id_maps[table] = {sys.intern(row["name"]): row["id"] for row in rows}
+    article_rows = await conn.fetch("SELECT id FROM articles ORDER BY id")
+    return {**id_maps, "articles": [row["id"] for row in article_rows]}
 
-    created_article_ids: List[int] = []
-    for art in source_articles:
-        author_id = author_ids[art["author"]]
-        category_id = category_ids[art["category"]]
-        article_id = await ensure_article(
-            title=art["title"],
-            content=art["content"],
-            author_id=author_id,
-            category_id=category_id,
+
+async def seed() -> Dict[str, Any]:
+    # Assumes DB is already connected and tables are initialized by the app startup
+
+    # One connection and one transaction for the whole seed: no per-helper
+    # pool checkouts, and a single commit instead of one per statement
+    async with db.pool.acquire() as conn, conn.transaction():  # type: ignore
+        # Workers start together; serialize so only the first one seeds and
+        # the rest see its committed rows in the check below
+        await conn.execute("SELECT pg_advisory_xact_lock($1)", STARTUP_LOCK_KEY)
+
+        # Already seeded (e.g. an app restart): skip generating and upserting everything
+        existing = await conn.fetchval("SELECT count(*) FROM articles")
+        if existing >= SEED_ARTICLE_COUNT:
+            return await _fetch_existing_ids(conn)
+
+        source_articles = _generated_articles(SEED_ARTICLE_COUNT)
+
+        # Seed data is reproducible (every write is an upsert), so don't wait
+        # for the WAL flush at commit; reverts when the transaction ends
+        await conn.execute("SET LOCAL synchronous_commit = OFF")
+
+        # Authors
+        author_ids = await ensure_many(
+            "authors",
+            [name for name, _ in AUTHORS],
+            bios=[bio for _, bio in AUTHORS],
+            conn=conn,
         )
-        await add_article_tags(article_id, [tag_ids[t] for t in art["tags"]])
-        created_article_ids.append(article_id)
+
+        # Categories
+        category_ids = await ensure_many("categories", CATEGORIES, conn=conn)
+
+        # Tags
+        tag_ids = await ensure_many("tags", TAGS, conn=conn)
+
+        records = [
+            (art["title"], art["content"], author_ids[art["author"]], category_ids[art["category"]])
+            for art in source_articles
+        ]
+        if await conn.fetchval("SELECT NOT EXISTS (SELECT 1 FROM articles)"):
+            # Fresh database: stream every article in a single COPY
+            created_article_ids = await copy_articles(records, conn=conn)
+        else:
+            # Incremental seed: one batched upsert keyed on title
+            created_article_ids = await ensure_articles(records, conn=conn)
+
+        # Resolve tag ids once per distinct tag combination, not per article
+        tag_id_lookup = {
+            combo: [tag_ids[t] for t in combo]
+            for combo in {art["tags"] for art in source_articles}
+        }
+        article_tag_pairs: List[Tuple[int, int]] = [
+            (article_id, tag_id)
+            for article_id, art in zip(created_article_ids, source_articles, strict=True)
+            for tag_id in tag_id_lookup[art["tags"]]
+        ]
+
+        # All article/tag links in one INSERT instead of one per tag
+        await add_article_tags(article_tag_pairs, conn=conn)
+
+    # Categories were written with a raw upsert, so drop the cached snapshot
+    db.invalidate_cache("categories")
 
     return {
         "authors": author_ids,
@@ -231,6 +387,10 @@ if __name__ == "__main__":
         finally:
             await db.close()
 
-    asyncio.run(_main())
+    import uvloop
+
+    # The seed is many small awaits; uvloop's libuv loop schedules them faster
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        runner.run(_main())
 
 